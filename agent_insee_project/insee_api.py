@@ -11,11 +11,50 @@ permettre à l'application de les gérer proprement.
 from __future__ import annotations
 
 import os
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterable, List, Optional
 
 import pandas as pd  # type: ignore
 import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from urllib3.util.retry import Retry  # type: ignore
+
+try:
+    import orjson  # type: ignore
+
+    _loads = orjson.loads
+except ImportError:
+    # orjson est facultatif : à défaut, on se rabat sur le module standard.
+    import json
+
+    _loads = json.loads
+
+try:
+    import pyarrow  # type: ignore  # noqa: F401
+
+    _HAS_PYARROW = True
+except ImportError:
+    # pyarrow est facultatif : sans lui, les colonnes restent au format NumPy.
+    _HAS_PYARROW = False
+
+try:
+    import ijson  # type: ignore
+except ImportError:
+    # ijson est facultatif : sans lui, les réponses sont lues en une fois.
+    ijson = None  # type: ignore
+
+
+def _extract_dict_obs(obs: dict) -> tuple[object, object]:
+    """Extrait le couple (date, valeur) d'une observation au format dict."""
+    return obs.get("date") or obs.get("time"), obs.get("value")
+
+
+def _extract_list_obs(obs: list) -> tuple[object, object]:
+    """Extrait le couple (date, valeur) d'une observation au format liste."""
+    return (obs[0], obs[1]) if len(obs) >= 2 else (None, None)
 
 
 class InseeAPI:
@@ -24,6 +63,10 @@ class InseeAPI:
     Cette classe gère l'authentification via le mécanisme ``client_credentials``
     et expose des méthodes pour interroger des séries BDM.  Les jetons sont
     automatiquement renouvelés lorsque la date d'expiration est atteinte.
+    Une session HTTP persistante est conservée afin de réutiliser les
+    connexions entre les appels ; elle peut être fermée via ``close`` ou en
+    utilisant le client comme gestionnaire de contexte
+    (``with InseeAPI(...) as api:``).
 
     Parameters
     ----------
@@ -43,6 +86,17 @@ class InseeAPI:
         Si les identifiants ne sont pas fournis.
     """
 
+    # Marge (en secondes) avant l'expiration réelle à partir de laquelle le
+    # jeton est renouvelé, afin d'éviter qu'il n'expire pendant une requête.
+    _TOKEN_SKEW_SEC = 60
+    # Taille transférée (en octets, telle qu'annoncée par Content-Length, donc
+    # compressée le cas échéant) au-delà de laquelle une réponse BDM est
+    # analysée au fil de l'eau avec ijson.  En gzip, 1 Mo transféré
+    # correspond à plusieurs Mo de JSON décodé.
+    _STREAM_MIN_BYTES = 1_000_000
+    # Nombre maximal de réponses conservées pour les requêtes conditionnelles
+    _ETAG_CACHE_SIZE = 32
+
     def __init__(
         self,
         client_id: Optional[str] = None,
@@ -54,10 +108,47 @@ class InseeAPI:
         self.base_url = base_url.rstrip("/")
         self._access_token: Optional[str] = None
         self._token_expiry: float = 0.0
+        # En-tête d'autorisation reconstruit uniquement lors d'un renouvellement
+        self._auth_header: dict[str, str] = {}
+        # Verrou protégeant le renouvellement du jeton lors des appels parallèles
+        self._token_lock = threading.Lock()
+        # Dernière réponse connue par requête (URL + paramètres) : ETag et
+        # DataFrame associé, pour les requêtes conditionnelles.  Cache LRU
+        # borné, partagé par les threads des appels parallèles.
+        self._etag_cache: "OrderedDict[tuple, tuple[str, pd.DataFrame]]" = OrderedDict()
+        self._etag_lock = threading.Lock()
         if not self.client_id or not self.client_secret:
             raise ValueError(
                 "client_id et client_secret doivent être fournis via les arguments ou les variables d'environnement"
             )
+        # Session persistante : les connexions TCP/TLS sont réutilisées d'un
+        # appel à l'autre, et les erreurs transitoires sont réessayées.
+        self._session = requests.Session()
+        self._session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=10,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                ),
+            ),
+        )
+        self._session.headers.update(
+            {"Accept-Encoding": "gzip, deflate", "Accept": "application/json"}
+        )
+
+    def close(self) -> None:
+        """Ferme la session HTTP et libère les connexions associées."""
+        self._session.close()
+
+    def __enter__(self) -> "InseeAPI":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     def _obtain_token(self) -> None:
         """Obtenir ou renouveler le jeton d'accès.
@@ -68,10 +159,11 @@ class InseeAPI:
         """
         url = f"{self.base_url}/token?grant_type=client_credentials"
         # Le corps peut être vide ; l'authentification se fait via Basic Auth
-        response = requests.post(url, auth=(self.client_id, self.client_secret), data={})
+        response = self._session.post(url, auth=(self.client_id, self.client_secret), data={})
         response.raise_for_status()
         data = response.json()
         self._access_token = data.get("access_token")
+        self._auth_header = {"Authorization": f"Bearer {self._access_token}"}
         # Certaines API renvoient expires_in (en secondes), sinon on suppose 3600
         expires_in = data.get("expires_in", 3600)
         self._token_expiry = time.time() + float(expires_in)
@@ -79,13 +171,25 @@ class InseeAPI:
     def get_token(self) -> str:
         """Retourne un jeton d'accès valide.
 
-        Si aucun jeton n'est présent ou si le jeton a expiré, un nouveau
-        jeton est demandé.  Le jeton est ensuite retourné.
+        Si aucun jeton n'est présent ou si le jeton expire dans moins de
+        ``_TOKEN_SKEW_SEC`` secondes, un nouveau jeton est demandé.  Le jeton
+        est ensuite retourné.
         """
-        if not self._access_token or time.time() >= self._token_expiry:
-            self._obtain_token()
-        assert self._access_token is not None  # pour mypy/pylint
-        return self._access_token
+        with self._token_lock:
+            if not self._access_token or time.time() >= self._token_expiry - self._TOKEN_SKEW_SEC:
+                self._obtain_token()
+            assert self._access_token is not None  # pour mypy/pylint
+            return self._access_token
+
+    def _invalidate_token(self, rejected_header: dict[str, str]) -> None:
+        """Oublie le jeton courant s'il correspond à celui rejeté par l'API.
+
+        La comparaison évite qu'un thread n'invalide un jeton déjà renouvelé
+        par un autre thread.
+        """
+        with self._token_lock:
+            if rejected_header is self._auth_header:
+                self._access_token = None
 
     def get_bdm_series(
         self,
@@ -95,6 +199,7 @@ class InseeAPI:
         detail: Optional[str] = None,
         include_history: bool = False,
         updated_after: Optional[str] = None,
+        max_batch: int = 20,
     ) -> pd.DataFrame:
         """Récupère des séries BDM identifiées par un ou plusieurs identifiants `idbank`.
 
@@ -123,31 +228,45 @@ class InseeAPI:
         updated_after : str, optional
             Permet de ne récupérer que les observations postérieures à une date
             donnée (format `YYYY-MM-DD`).
+        max_batch : int, optional
+            Nombre maximal d'identifiants par appel.  Au-delà, la liste est
+            découpée en lots interrogés en parallèle puis concaténés.
 
         Returns
         -------
         pandas.DataFrame
-            Un DataFrame avec au moins trois colonnes : ``idbank``, ``date`` et
-            ``value``.  D'autres colonnes sont ajoutées si la réponse contient
-            des métadonnées supplémentaires.
+            Un DataFrame avec au moins trois colonnes : ``idbank`` (de type
+            ``category``), ``date`` (convertie en ``datetime64`` lorsque toutes
+            les périodes sont reconnues, laissée sous forme de chaînes sinon)
+            et ``value`` (numérique en ``float64``, manquante si la conversion
+            échoue ; adossée à Arrow lorsque ``pyarrow`` est installé).
+            D'autres colonnes sont ajoutées si la réponse contient des
+            métadonnées supplémentaires.
 
         Raises
         ------
         requests.HTTPError
             Si l'appel réseau échoue ou si l'API renvoie un code d'erreur.
+        requests.exceptions.RetryError
+            Si l'API renvoie de façon répétée un code 429 ou 5xx et que les
+            nouvelles tentatives automatiques de la session sont épuisées.
+        ValueError
+            Si aucun identifiant idbank n'est fourni ou si ``max_batch`` est
+            inférieur à 1.
         """
         # Gestion du paramètre idbanks
         if isinstance(idbanks, (list, tuple, set)):
-            # filtrer les valeurs vides et join
-            id_list = [str(x).strip() for x in idbanks if str(x).strip()]
-            ids = "+".join(id_list)
+            # normaliser une seule fois chaque valeur puis filtrer les vides
+            id_list = list(filter(None, (str(x).strip() for x in idbanks)))
         else:
             ids = str(idbanks).strip()
-        if not ids:
+            id_list = [ids] if ids else []
+        if not id_list:
             raise ValueError("Au moins un identifiant idbank doit être fourni.")
+        if max_batch < 1:
+            raise ValueError("max_batch doit être un entier supérieur ou égal à 1.")
 
-        # Construction de l'URL et des paramètres de requête
-        endpoint = f"{self.base_url}/series/data/SERIES_BDM/{ids}"
+        # Construction des paramètres de requête
         params: dict[str, str] = {}
         if start_period:
             params["startPeriod"] = start_period
@@ -160,33 +279,142 @@ class InseeAPI:
         if updated_after:
             params["updatedAfter"] = updated_after
 
-        headers = {"Authorization": f"Bearer {self.get_token()}"}
-        response = requests.get(endpoint, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
+        # Obtenir le jeton avant un éventuel envoi parallèle, afin que les
+        # différents threads partagent le même jeton.
+        self.get_token()
+        if len(id_list) > max_batch:
+            # Découpage en lots interrogés en parallèle : les latences réseau
+            # des différents appels se recouvrent.
+            batches = [
+                "+".join(id_list[i : i + max_batch]) for i in range(0, len(id_list), max_batch)
+            ]
+            with ThreadPoolExecutor(max_workers=min(8, len(batches))) as executor:
+                frames = list(executor.map(lambda ids: self._fetch_one(ids, params), batches))
+            df = pd.concat(frames, ignore_index=True)
+        else:
+            df = self._fetch_one("+".join(id_list), params)
+
+        # Conversion vectorisée unique des colonnes : les consommateurs n'ont
+        # plus à réanalyser les dates et chaque idbank n'est stocké qu'une fois
+        # grâce au type catégoriel.  Les périodes que pandas ne sait pas
+        # interpréter (semestres ``2023-S1``, bimestres, semaines...) ne
+        # doivent pas être perdues : si une seule date non vide deviendrait
+        # ``NaT``, la colonne conserve les chaînes d'origine.  Les valeurs
+        # restent en float64 : un passage en float32 altérerait les séries
+        # statistiques (105.3 deviendrait 105.30000305).
+        df["idbank"] = df["idbank"].astype("category")
+        dates = pd.to_datetime(df["date"], errors="coerce", format="mixed")
+        if not (dates.isna() & df["date"].notna()).any():
+            df["date"] = dates
+        df["value"] = pd.to_numeric(df["value"], errors="coerce")
+        if _HAS_PYARROW:
+            # Seule la colonne value est adossée à Arrow (valeurs manquantes
+            # explicites, transmission directe à Streamlit) ; date et idbank
+            # gardent leurs types NumPy/catégoriel, déjà compacts et reconnus
+            # par les fonctions pandas.api.types.  On évite la conversion des
+            # flottants entiers en entiers pour garder un type stable.
+            df["value"] = df["value"].convert_dtypes(dtype_backend="pyarrow", convert_integer=False)
+        return df
 
+    def _fetch_one(self, ids: str, params: dict[str, str]) -> pd.DataFrame:
+        """Effectue un appel BDM pour un lot d'identifiants déjà concaténés.
+
+        En cas de réponse 401, le jeton est renouvelé et l'appel réessayé une
+        seule fois.  Si l'API a fourni un ``ETag`` lors d'un appel identique
+        précédent, la requête est conditionnelle (``If-None-Match``) et une
+        réponse 304 renvoie le DataFrame déjà connu.  Seules les
+        ``_ETAG_CACHE_SIZE`` réponses les plus récemment utilisées sont
+        conservées.  Ce cache recoupe celui de ``st.cache_data`` dans
+        l'application Streamlit : il sert surtout après l'expiration de ce
+        dernier ou hors de Streamlit.  Le DataFrame renvoyé contient les
+        colonnes ``idbank``, ``date`` et ``value`` sans conversion de type.
+        """
+        endpoint = f"{self.base_url}/series/data/SERIES_BDM/{ids}"
+        cache_key = (endpoint, tuple(sorted(params.items())))
+        with self._etag_lock:
+            cached = self._etag_cache.get(cache_key)
+            if cached is not None:
+                self._etag_cache.move_to_end(cache_key)
+
+        def send(auth: dict[str, str]) -> requests.Response:
+            headers = {**auth, "If-None-Match": cached[0]} if cached else auth
+            return self._session.get(endpoint, headers=headers, params=params, stream=True)
+
+        self.get_token()
+        auth = self._auth_header
+        response = send(auth)
+        if response.status_code == 401:
+            # Jeton révoqué ou expiré côté serveur : on le renouvelle et on
+            # réessaie une seule fois.
+            response.close()
+            self._invalidate_token(auth)
+            self.get_token()
+            response = send(self._auth_header)
+        with response:
+            if response.status_code == 304 and cached is not None:
+                # Copie superficielle : l'appelant peut réassigner des colonnes
+                # sans altérer la version en cache.
+                return cached[1].copy(deep=False)
+            response.raise_for_status()
+            df = self._series_to_frame(self._iter_series(response))
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._etag_lock:
+                self._etag_cache[cache_key] = (etag, df.copy(deep=False))
+                self._etag_cache.move_to_end(cache_key)
+                if len(self._etag_cache) > self._ETAG_CACHE_SIZE:
+                    self._etag_cache.popitem(last=False)
+        return df
+
+    def _iter_series(self, response: requests.Response) -> Iterable[dict]:
+        """Renvoie les séries contenues dans une réponse BDM.
+
+        Lorsque ``ijson`` est installé et que la taille annoncée de la réponse
+        dépasse ``_STREAM_MIN_BYTES``, les séries sont lues au fil de l'eau
+        depuis le flux décompressé, sans matérialiser l'intégralité du document
+        JSON.  Les réponses de taille inconnue (transfert par blocs) sont lues
+        en une fois : l'analyse complète avec ``_loads`` y reste plus rapide.
+        """
+        length = response.headers.get("Content-Length")
+        if ijson is not None and length is not None and int(length) >= self._STREAM_MIN_BYTES:
+            # Le flux brut n'est pas décompressé par défaut
+            response.raw.decode_content = True
+            return ijson.items(response.raw, "series.item", use_float=True)
+        data = _loads(response.content)
         # La structure de la réponse de l'API BDM comporte généralement une clé
         # "series" contenant une liste de séries ; chaque série possède un
         # identifiant idBank et une liste d'observations.  Chaque observation
-        # contient une date et une valeur.  Le code ci‑dessous tente de convertir
-        # cette structure en DataFrame.  Si la structure change, adaptez le code.
-        series_list: List[dict] = data.get("series", [])  # type: ignore
-        records: List[dict] = []
+        # contient une date et une valeur.  Si la structure change, adaptez le code.
+        return data.get("series", [])  # type: ignore
+
+    @staticmethod
+    def _series_to_frame(series_list: Iterable[dict]) -> pd.DataFrame:
+        """Convertit une suite de séries BDM en DataFrame ``idbank``/``date``/``value``."""
+        # Construction colonne par colonne : évite un dict par observation
+        idbanks_col: List[Optional[str]] = []
+        dates_col: List[object] = []
+        values_col: List[object] = []
         for serie in series_list:
             idbank = serie.get("idBank")
             # Certaines implémentations utilisent la clé "values" pour les valeurs
             observations = serie.get("values", [])
+            if not observations:
+                continue
+            # obs peut être un dict ou une liste selon le format ; le format
+            # étant homogène au sein d'une série, on choisit l'extracteur
+            # d'après la première observation plutôt qu'à chaque itération.
+            first = observations[0]
+            if isinstance(first, dict):
+                extract = _extract_dict_obs
+            elif isinstance(first, list):
+                extract = _extract_list_obs
+            else:
+                continue
             for obs in observations:
-                # obs peut être un dict ou une liste selon le format ; on tente
-                date = None
-                value = None
-                if isinstance(obs, dict):
-                    date = obs.get("date") or obs.get("time")
-                    value = obs.get("value")
-                elif isinstance(obs, list) and len(obs) >= 2:
-                    date, value = obs[0], obs[1]
+                date, value = extract(obs)
                 if date is not None:
-                    records.append({"idbank": idbank, "date": date, "value": value})
+                    idbanks_col.append(idbank)
+                    dates_col.append(date)
+                    values_col.append(value)
 
-        df = pd.DataFrame(records)
-        return df
\ No newline at end of file
+        return pd.DataFrame({"idbank": idbanks_col, "date": dates_col, "value": values_col})
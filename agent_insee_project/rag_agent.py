@@ -9,23 +9,38 @@ facilement à une application Streamlit.
 from __future__ import annotations
 
 import os
-from typing import Optional
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
 
 import pandas as pd  # type: ignore
 
 try:
-    import openai  # type: ignore
+    from openai import OpenAI  # type: ignore
 except ImportError:
-    # L'import d'OpenAI échouera si le package n'est pas installé.  Dans ce
-    # cas, les fonctions dépendantes renverront un message d'erreur.
-    openai = None  # type: ignore
+    # L'import d'OpenAI échouera si le package n'est pas installé (ou s'il
+    # s'agit d'une version antérieure à 1.0).  Dans ce cas, les fonctions
+    # dépendantes renverront un message d'erreur.
+    OpenAI = None  # type: ignore
+
+
+# Cache des contextes déjà calculés, indexé par l'identité et la forme du
+# DataFrame.  Une référence faible permet de vérifier que l'objet en cache est
+# toujours le même (``id`` pouvant être réutilisé après destruction).  Le
+# cache est partagé par les threads des sessions Streamlit, d'où le verrou.
+_CONTEXT_CACHE_SIZE = 32
+_context_cache: "OrderedDict[tuple, Tuple[weakref.ref, str]]" = OrderedDict()
+_context_lock = threading.Lock()
 
 
 def dataframe_to_context(df: pd.DataFrame, max_rows: int = 5) -> str:
     """Convertit les premières lignes d'un DataFrame en chaîne de caractères.
 
     Cela permet de fournir un aperçu du jeu de données au modèle de
-    génération.  Par défaut, seules les 5 premières lignes sont utilisées.
+    génération, au format CSV.  Par défaut, seules les 5 premières lignes sont
+    utilisées.
 
     Parameters
     ----------
@@ -38,28 +53,59 @@ def dataframe_to_context(df: pd.DataFrame, max_rows: int = 5) -> str:
     -------
     str
         Une chaîne représentant les premières lignes du DataFrame.
+
+    Notes
+    -----
+    Le résultat est mémorisé pour un même objet DataFrame (même identité,
+    même forme et mêmes colonnes) : une modification en place des valeurs
+    n'est donc pas détectée.
     """
     if df.empty:
         return "Le jeu de données est vide."
+    key = (id(df), max_rows, df.shape, tuple(df.columns))
+    with _context_lock:
+        cached = _context_cache.get(key)
+        if cached is not None and cached[0]() is df:
+            _context_cache.move_to_end(key)
+            return cached[1]
     try:
-        context = df.head(max_rows).to_string(index=False)
+        # Le format CSV est bien plus rapide à produire que ``to_string`` et
+        # reste tout aussi lisible pour le modèle de langage.
+        context = df.head(max_rows).to_csv(index=False)
     except Exception:
         context = str(df.head(max_rows))
+    with _context_lock:
+        _context_cache[key] = (weakref.ref(df), context)
+        _context_cache.move_to_end(key)
+        if len(_context_cache) > _CONTEXT_CACHE_SIZE:
+            _context_cache.popitem(last=False)
     return context
 
 
+@lru_cache(maxsize=4)
+def get_openai_client(api_key: str) -> "OpenAI":
+    """Retourne un client OpenAI partagé pour une clé donnée.
+
+    Le client conserve son pool de connexions HTTP ; le réutiliser évite une
+    nouvelle négociation TLS à chaque question.
+    """
+    return OpenAI(api_key=api_key)
+
+
 def ask_question(
     df: pd.DataFrame,
     question: str,
     model: str = "gpt-3.5-turbo",
     temperature: float = 0.2,
-) -> str:
+) -> Iterator[str]:
     """Pose une question à un modèle OpenAI en utilisant un DataFrame comme contexte.
 
     La fonction assemble un prompt en français contenant un extrait du jeu de
     données ainsi que la question de l'utilisateur.  Elle appelle ensuite
-    l'API OpenAI pour obtenir une réponse.  Si la clé API n'est pas définie ou
-    si le package `openai` n'est pas installé, un message d'erreur est renvoyé.
+    l'API OpenAI en mode *streaming* et produit la réponse au fur et à mesure
+    de sa génération, ce qui permet de l'afficher dès les premiers mots (par
+    exemple avec ``st.write_stream``).  Si la clé API n'est pas définie ou si
+    le package `openai` n'est pas installé, un message d'erreur est produit.
 
     Parameters
     ----------
@@ -72,17 +118,19 @@ def ask_question(
     temperature : float, optional
         Température du modèle pour ajuster la créativité.
 
-    Returns
-    -------
+    Yields
+    ------
     str
-        La réponse générée ou un message d'erreur en cas de problème.
+        Les fragments successifs de la réponse, ou un message d'erreur en cas
+        de problème.
     """
-    if openai is None:
-        return "Le package openai n'est pas installé. Veuillez l'ajouter aux dépendances."
+    if OpenAI is None:
+        yield "Le package openai (>= 1.0) n'est pas installé. Veuillez l'ajouter aux dépendances."
+        return
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        return "Aucune clé OPENAI_API_KEY trouvée. Définissez cette variable d'environnement dans votre système ou dans Streamlit."
-    openai.api_key = api_key
+        yield "Aucune clé OPENAI_API_KEY trouvée. Définissez cette variable d'environnement dans votre système ou dans Streamlit."
+        return
     # Construire le contexte
     context = dataframe_to_context(df)
     messages = [
@@ -96,12 +144,19 @@ def ask_question(
         },
     ]
     try:
-        response = openai.ChatCompletion.create(
+        client = get_openai_client(api_key)
+        stream = client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=temperature,
             max_tokens=256,
+            stream=True,
         )
-        return response.choices[0].message.get("content", "").strip()
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                yield content
     except Exception as exc:
-        return f"Erreur lors de l'appel à l'API OpenAI : {exc}"
\ No newline at end of file
+        yield f"Erreur lors de l'appel à l'API OpenAI : {exc}"
\ No newline at end of file
@@ -15,7 +15,7 @@ Ce module définit une interface web interactive permettant :
 from __future__ import annotations
 
 import os
-from typing import List
+from typing import List, Optional, Tuple
 
 import pandas as pd  # type: ignore
 import streamlit as st  # type: ignore
@@ -24,6 +24,91 @@ from insee_api import InseeAPI
 from rag_agent import ask_question
 
 
+@st.cache_resource
+def get_api_client(client_id: str, client_secret: str) -> InseeAPI:
+    """Retourne un client INSEE partagé entre les réexécutions du script.
+
+    Le client (et donc son jeton et sa session HTTP) est conservé en cache
+    pour chaque couple d'identifiants, ce qui évite une nouvelle
+    authentification à chaque interaction.
+    """
+    return InseeAPI(client_id=client_id, client_secret=client_secret)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_bdm(
+    _api: InseeAPI,
+    idbanks: Tuple[str, ...],
+    start_period: Optional[str],
+    last_n_observations: Optional[int],
+    detail: Optional[str],
+    include_history: bool,
+    updated_after: Optional[str],
+) -> pd.DataFrame:
+    """Interroge l'API BDM en mettant le résultat en cache pendant une heure.
+
+    Le client ``_api`` est exclu du calcul de la clé de cache (préfixe
+    ``_``) ; seuls les paramètres de la requête sont pris en compte.
+    """
+    return _api.get_bdm_series(
+        idbanks=list(idbanks),
+        start_period=start_period,
+        last_n_observations=last_n_observations,
+        detail=detail,
+        include_history=include_history,
+        updated_after=updated_after,
+    )
+
+
+@st.fragment
+def analysis_panel(df: pd.DataFrame) -> None:
+    """Affiche le jeu de données chargé, l'exploration par colonne et la section RAG.
+
+    Décorée avec ``st.fragment``, cette fonction est seule réexécutée lorsque
+    l'un de ses widgets change, sans relancer le reste de l'application.
+    """
+    st.markdown("## Jeu de données chargé")
+    st.dataframe(df, use_container_width=True)
+
+    # Sélection de colonne pour exploration
+    if not df.empty:
+        st.markdown("### Analyse par colonne")
+        selected_column = st.selectbox("Choisissez une colonne à explorer", options=df.columns.tolist())
+        if selected_column:
+            col_data = df[selected_column]
+            # Afficher statistiques selon le type
+            if pd.api.types.is_numeric_dtype(col_data):
+                st.write("Statistiques descriptives :")
+                st.write(col_data.describe())
+                # Si une colonne 'date' existe, utiliser comme index pour un graphique de série
+                # La colonne date est déjà convertie par InseeAPI.get_bdm_series
+                # lorsque toutes les périodes sont reconnues ; sinon elle reste
+                # textuelle et l'on trace simplement la série des valeurs.
+                if "date" in df.columns and pd.api.types.is_datetime64_any_dtype(df["date"].dtype):
+                    chart_df = df[["date", selected_column]].dropna().set_index("date").sort_index()
+                    st.line_chart(chart_df)
+                else:
+                    st.line_chart(col_data.dropna())
+            else:
+                # Colonnes non numériques : afficher les effectifs des valeurs
+                st.write("Effectifs des modalités :")
+                counts = col_data.value_counts().rename_axis(selected_column).reset_index(name="Effectif")
+                st.dataframe(counts)
+
+    # Section RAG pour poser des questions
+    st.markdown("### Posez une question sur ce jeu de données")
+    question = st.text_input(
+        "Votre question", value="", help="Exemple : Quel est la moyenne de la variable value ?"
+    )
+    if st.button("Interroger l'agent"):
+        if not question.strip():
+            st.warning("Veuillez entrer une question avant de cliquer sur le bouton.")
+        else:
+            with st.spinner("Génération de la réponse..."):
+                st.markdown("**Réponse de l'agent :**")
+                st.write_stream(ask_question(df, question))
+
+
 def main() -> None:
     st.set_page_config(page_title="Agent INSEE RAG", layout="wide")
     st.title("Agent RAG pour les données INSEE")
@@ -99,7 +184,7 @@ def main() -> None:
     api_client = None
     if client_id and client_secret:
         try:
-            api_client = InseeAPI(client_id=client_id, client_secret=client_secret)
+            api_client = get_api_client(client_id, client_secret)
         except ValueError as e:
             st.error(str(e))
 
@@ -111,13 +196,14 @@ def main() -> None:
             with st.spinner("Appel de l'API INSEE en cours..."):
                 idbanks: List[str] = [x.strip() for x in idbanks_input.split(",") if x.strip()]
                 try:
-                    df = api_client.get_bdm_series(
-                        idbanks=idbanks,
-                        start_period=start_period if start_period else None,
-                        last_n_observations=int(last_n_observations) if last_n_observations else None,
-                        detail=detail if detail else None,
-                        include_history=include_history,
-                        updated_after=updated_after if updated_after else None,
+                    df = fetch_bdm(
+                        api_client,
+                        tuple(idbanks),
+                        start_period if start_period else None,
+                        int(last_n_observations) if last_n_observations else None,
+                        detail if detail else None,
+                        include_history,
+                        updated_after if updated_after else None,
                     )
                     if df.empty:
                         st.warning("Aucune observation trouvée pour ces paramètres.")
@@ -129,49 +215,7 @@ def main() -> None:
 
     # --- Affichage des données et exploration ---
     if "df" in st.session_state:
-        df: pd.DataFrame = st.session_state["df"]
-        st.markdown("## Jeu de données chargé")
-        st.dataframe(df, use_container_width=True)
-
-        # Sélection de colonne pour exploration
-        if not df.empty:
-            st.markdown("### Analyse par colonne")
-            selected_column = st.selectbox("Choisissez une colonne à explorer", options=df.columns.tolist())
-            if selected_column:
-                col_data = df[selected_column]
-                # Afficher statistiques selon le type
-                if pd.api.types.is_numeric_dtype(col_data):
-                    st.write("Statistiques descriptives :")
-                    st.write(col_data.describe())
-                    # Si une colonne 'date' existe, utiliser comme index pour un graphique de série
-                    if "date" in df.columns and pd.api.types.is_datetime64_any_dtype(pd.to_datetime(df["date"], errors="coerce")):
-                        # Conversion de la colonne date
-                        tmp_df = df.copy()
-                        tmp_df["date"] = pd.to_datetime(tmp_df["date"], errors="coerce")
-                        chart_df = tmp_df[["date", selected_column]].dropna().set_index("date").sort_index()
-                        st.line_chart(chart_df)
-                    else:
-                        st.line_chart(col_data.dropna())
-                else:
-                    # Colonnes non numériques : afficher les effectifs des valeurs
-                    st.write("Effectifs des modalités :")
-                    counts = col_data.value_counts().reset_index()
-                    counts.columns = [selected_column, "Effectif"]
-                    st.dataframe(counts)
-
-        # Section RAG pour poser des questions
-        st.markdown("### Posez une question sur ce jeu de données")
-        question = st.text_input(
-            "Votre question", value="", help="Exemple : Quel est la moyenne de la variable value ?"
-        )
-        if st.button("Interroger l'agent"):
-            if not question.strip():
-                st.warning("Veuillez entrer une question avant de cliquer sur le bouton.")
-            else:
-                with st.spinner("Génération de la réponse..."):
-                    answer = ask_question(df, question)
-                    st.markdown("**Réponse de l'agent :**")
-                    st.write(answer)
+        analysis_panel(st.session_state["df"])
 
 
 if __name__ == "__main__":